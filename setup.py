@@ -19,6 +19,11 @@ setup(
     url='https://github.com/dubs-subnet/windsurf-scraper',
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        'onnx': ['optimum[onnxruntime]>=1.14.0'],
+        'faiss': ['faiss-cpu>=1.7.4'],
+        'numba': ['numba>=0.58.0'],
+    },
     entry_points={
         'console_scripts': [
             'windsurf-scraper=windsurf_scraper.scraper:main',
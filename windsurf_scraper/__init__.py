@@ -1,3 +1,10 @@
-from .scraper import DocumentationScraper
-
 __version__ = '0.1.0'
+
+
+def __getattr__(name):
+    # Import the scraper on first use so worker processes can load light
+    # submodules such as repo_files without its heavy dependencies
+    if name == 'DocumentationScraper':
+        from .scraper import DocumentationScraper
+        return DocumentationScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
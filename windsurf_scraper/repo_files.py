@@ -0,0 +1,48 @@
+import os
+from datetime import datetime
+
+import orjson
+
+# Kept free of the scraper's heavy imports (torch, numba, faiss, ...) because
+# repository files are processed in worker processes that import this module
+
+
+def process_repo_file(args):
+    """Read one repository file and serialize its content record.
+    
+    Runs in a worker process, so it only takes and returns plain values.
+    
+    Args:
+        args (tuple): ``(repo_url, repo_path, relative_path, file_id)``
+    
+    Returns:
+        tuple: ``(file_id, metadata entry, content JSON bytes)``, or None for
+        binary or unreadable files
+    """
+    repo_url, repo_path, relative_path, file_id = args
+    file_path = os.path.join(repo_path, relative_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except UnicodeDecodeError:
+        # Skip binary files
+        return None
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return None
+    
+    url = f"{repo_url}/blob/main/{relative_path}"
+    content_json = orjson.dumps({
+        'url': url,
+        'path': relative_path,
+        'content': content,
+        'type': 'github_file'
+    })
+    entry = {
+        'url': url,
+        'title': relative_path,
+        'type': 'github_file',
+        'timestamp': datetime.now().isoformat(),
+        'repo_url': repo_url
+    }
+    return file_id, entry, content_json
@@ -1,280 +1,934 @@
 import os
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 from urllib.parse import urlparse, urljoin
 from datetime import datetime
 import hashlib
-import json
+import orjson
 import argparse
+import atexit
 import re
+import sqlite3
+import sys
+import threading
 from collections import deque
-import nltk
-from nltk.tokenize import sent_tokenize
-import html2text
-from sentence_transformers import SentenceTransformer
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
 import numpy as np
 from tqdm import tqdm
 import markdown
 import subprocess
 from pathlib import Path
 
+try:
+    from .repo_files import process_repo_file
+except ImportError:
+    # Run directly as a script (python scraper.py) rather than from the package
+    from repo_files import process_repo_file
+
+# Prefer the C-backed lxml parser, falling back to the stdlib parser if it is unavailable
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# FAISS is optional; without it semantic search falls back to a brute-force NumPy scan
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Numba is optional; when present it scores sections in a parallel JIT-compiled loop
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_scores(matrix, query):
+        """Dot each row of a row-normalized matrix with a normalized query"""
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for i in prange(matrix.shape[0]):
+            total = np.float32(0.0)
+            for j in range(matrix.shape[1]):
+                total += matrix[i, j] * query[j]
+            scores[i] = total
+        return scores
+else:
+    def _cosine_scores(matrix, query):
+        """Dot each row of a row-normalized matrix with a normalized query"""
+        return matrix @ query
+
+# Scraped pages and their section vectors live in one SQLite database
+CORPUS_SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT,
+    summary TEXT,
+    content_json BLOB
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    title TEXT,
+    vec BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_page_id ON sections(page_id);
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    hash BLOB PRIMARY KEY,
+    vec BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+# URL type detection only looks at the page title and meta description
+HEAD_STRAINER = SoupStrainer(['title', 'meta'])
+
+class OnnxSentenceEncoder:
+    """ONNX Runtime replacement for SentenceTransformer.encode (mean pooling).
+
+    The model is exported, graph-optimized and dynamically int8-quantized on
+    first use, then cached in ``cache_dir``. Requires ``optimum[onnxruntime]``.
+    """
+
+    MODEL_FILE = 'model_optimized_quantized.onnx'
+
+    def __init__(self, model_id='sentence-transformers/all-MiniLM-L6-v2', cache_dir='onnx-model', max_length=256):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+        from transformers import AutoTokenizer
+
+        if not os.path.exists(os.path.join(cache_dir, self.MODEL_FILE)):
+            print(f"Exporting {model_id} to ONNX in {cache_dir}...")
+            model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+            optimizer = ORTOptimizer.from_pretrained(model)
+            optimizer.optimize(save_dir=cache_dir, optimization_config=OptimizationConfig(optimization_level=99))
+            quantizer = ORTQuantizer.from_pretrained(cache_dir, file_name='model_optimized.onnx')
+            quantizer.quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            )
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(cache_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        self.session = ORTModelForFeatureExtraction.from_pretrained(cache_dir, file_name=self.MODEL_FILE)
+        self.max_length = max_length
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False,
+               convert_to_numpy=True, normalize_embeddings=False):
+        """Encode a string or list of strings, mirroring SentenceTransformer.encode"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        # Sort by length so each batch pads to a similar size, then restore order
+        order = np.argsort([-len(sentence) for sentence in sentences])
+        batches = []
+        for start in tqdm(range(0, len(sentences), batch_size), disable=not show_progress_bar):
+            batch = [sentences[i] for i in order[start:start + batch_size]]
+            inputs = self.tokenizer(batch, padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors='np')
+            token_embeddings = self.session(**inputs).last_hidden_state
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            batches.append((token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        
+        embeddings = np.empty((len(sentences), self.session.config.hidden_size), dtype=np.float32)
+        if batches:
+            embeddings[order] = np.vstack(batches)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
 class DocumentationScraper:
-    def __init__(self, base_dir="doc-resource"):
+    # Elements whose text never belongs in the extracted content
+    _SKIP_TAGS = frozenset(['head', 'nav', 'script', 'style', 'noscript', 'template', 'svg', 'img'])
+    # Classes marking navigation <div>s and header permalinks (<a>), skipped with their contents
+    _NAV_CLASSES = frozenset(['headerlink', 'nav', 'navigation'])
+    # Elements that continue the current line instead of starting a new one
+    _INLINE_TAGS = frozenset([
+        'a', 'abbr', 'b', 'bdi', 'bdo', 'cite', 'code', 'data', 'dfn', 'em', 'i', 'kbd',
+        'mark', 'q', 's', 'samp', 'small', 'span', 'strong', 'sub', 'sup', 'time', 'u', 'var'
+    ])
+    # Non-blank lines of preformatted text, without surrounding whitespace
+    _PRE_LINE_RE = re.compile(r'^[^\S\n]*(\S.*?)[^\S\n]*$', re.MULTILINE)
+
+    # Characters replaced with '_' when deriving filenames from URLs. ASCII paths
+    # go through a translation table; the regex covers the rare non-ASCII ones
+    _UNSAFE_FILENAME_TABLE = str.maketrans({
+        c: '_' for c in range(128) if not (chr(c).isalnum() or chr(c) in '._-')
+    })
+    _UNSAFE_FILENAME_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+    # Links to assets, fragments, queries and non-HTTP schemes are not followed
+    _SKIP_LINK_SUBSTRINGS = ('/static/', '/assets/', '/images/', '/css/', '/js/', '#', '?', 'mailto:', 'tel:')
+    _SKIP_LINK_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.css', '.js', '.ico')
+
+    # Number of extracted pages whose sections are embedded together
+    EMBEDDING_PAGE_BATCH = 16
+    # Texts per forward pass within a single encode call
+    EMBEDDING_BATCH_SIZE = 64
+    # Concurrent requests allowed against a single host, whatever the pool size
+    MAX_REQUESTS_PER_HOST = 8
+    # Section count from which FAISS uses an approximate HNSW index instead of an exact scan
+    FAISS_HNSW_MIN_ROWS = 50000
+    # Rows upcast to float32 at a time when scoring the float16 matrix on the CPU
+    SCORE_BLOCK_ROWS = 8192
+    # Pages are truncated to this many (decompressed) bytes before parsing
+    MAX_RESPONSE_BYTES = 20 * 1024 * 1024
+    # Read size used while streaming a response body
+    RESPONSE_CHUNK_BYTES = 64 * 1024
+
+    def __init__(self, base_dir="doc-resource", max_workers=16):
         self.base_dir = base_dir
+        self.max_workers = max_workers
         self.content_dir = os.path.join(base_dir, "content")
         self.index_dir = os.path.join(base_dir, "index")
-        self.embeddings_dir = os.path.join(base_dir, "embeddings")
         self.repos_dir = os.path.join(base_dir, "repos")
         
         # Create necessary directories
-        for directory in [self.content_dir, self.index_dir, self.embeddings_dir, self.repos_dir]:
+        for directory in [self.content_dir, self.index_dir, self.repos_dir]:
             if not os.path.exists(directory):
                 os.makedirs(directory)
         
+        # Pages and section embeddings; written only from the I/O thread below
+        self.corpus_file = os.path.join(base_dir, 'corpus.sqlite')
+        self._db = sqlite3.connect(self.corpus_file, check_same_thread=False)
+        self._db.executescript(CORPUS_SCHEMA)
+        
+        # Corpus writes run on a single background thread so disk I/O overlaps
+        # with fetching the next pages
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._io_futures = []
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Keep enough pooled connections for concurrent fetches to reuse them
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Per-host semaphores so concurrent workers stay polite to each server
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
         self.visited_urls = set()
+        # URL -> filename stem, so each URL is hashed and sanitized only once
+        self._filename_cache = {}
         
-        # Initialize HTML to text converter
-        self.text_converter = html2text.HTML2Text()
-        self.text_converter.ignore_links = False
-        self.text_converter.ignore_images = True
-        self.text_converter.ignore_tables = False
+        # Sentence embedding model, loaded on first use (see the model property)
+        self._model = None
         
-        # Initialize NLTK
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
-        # Initialize sentence transformer for embeddings
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Stacked section embeddings used by semantic_search, built lazily and
+        # extended as new sections are stored
+        self.index_vectors_file = os.path.join(self.index_dir, 'embeddings.f16.dat')
+        self.index_rows_file = os.path.join(self.index_dir, 'embeddings.json')
+        self.faiss_index_file = os.path.join(self.index_dir, 'faiss.index')
+        self._search_index = None
+        # Corpus state the loaded index was checked against, see _get_search_index
+        self._search_index_version = None
         
-        # Load or create metadata
+        # Load or create metadata; it is kept in memory, updates are appended to
+        # metadata.jsonl and compacted into metadata.json when a run finishes
         self.metadata_file = os.path.join(base_dir, 'metadata.json')
-        if not os.path.exists(self.metadata_file):
-            self._save_metadata({})
-        else:
-            metadata = self._load_metadata()
-            for data in metadata.values():
-                self.visited_urls.add(data['url'])
+        self.metadata_log_file = os.path.join(base_dir, 'metadata.jsonl')
+        self._metadata_cache = None
+        self._metadata_log = None
+        self._metadata_dirty = False
+        metadata = self._load_metadata()
+        if self._metadata_dirty or not os.path.exists(self.metadata_file):
+            self._save_metadata(metadata)
+        for data in metadata.values():
+            self.visited_urls.add(data['url'])
+        atexit.register(self._flush_metadata)
+        atexit.register(self._wait_for_writes)
+
+    @property
+    def model(self):
+        """Sentence embedding model, loaded on first access.
+        
+        Commands that never encode text, such as listing pages or cloning
+        repositories, skip importing torch and loading the model entirely.
+        """
+        if self._model is None:
+            if os.environ.get('USE_ONNX') == '1':
+                self._model = OnnxSentenceEncoder(cache_dir=os.path.join(self.base_dir, 'models', 'all-MiniLM-L6-v2-onnx'))
+            else:
+                import torch
+                from sentence_transformers import SentenceTransformer
+                
+                model = SentenceTransformer('all-MiniLM-L6-v2')
+                # Lower weight precision: fp16 on GPU, dynamic int8 quantization on CPU
+                if torch.cuda.is_available():
+                    model.half()
+                else:
+                    model = torch.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                self._model = model
+        return self._model
 
     def _save_metadata(self, metadata):
-        with open(self.metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        """Write the full metadata file and discard the update log it supersedes"""
+        self._metadata_cache = metadata
+        with open(self.metadata_file, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        
+        if self._metadata_log is not None:
+            self._metadata_log.close()
+            self._metadata_log = None
+        if os.path.exists(self.metadata_log_file):
+            os.remove(self.metadata_log_file)
+        self._metadata_dirty = False
 
     def _load_metadata(self):
-        if os.path.exists(self.metadata_file):
-            with open(self.metadata_file, 'r') as f:
-                return json.load(f)
-        return {}
+        if self._metadata_cache is None:
+            metadata = {}
+            if os.path.exists(self.metadata_file):
+                with open(self.metadata_file, 'rb') as f:
+                    metadata = orjson.loads(f.read())
+            
+            # Replay updates logged by a run that exited before compacting
+            if os.path.exists(self.metadata_log_file):
+                with open(self.metadata_log_file, 'rb') as f:
+                    for line in f:
+                        try:
+                            updates = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            # A torn final line from an interrupted write
+                            break
+                        for key, entry in updates.items():
+                            # A null entry records a removed key
+                            if entry is None:
+                                metadata.pop(key, None)
+                            else:
+                                metadata[key] = entry
+                self._metadata_dirty = True
+            self._metadata_cache = metadata
+        return self._metadata_cache
+
+    def _update_metadata(self, entries):
+        """Record metadata entries in memory and append them to the update log as one line.
+        
+        Entries kept under a different key for the same URL, such as keys from
+        the older MD5-based filename scheme, are dropped and logged as null.
+        """
+        if not entries:
+            return
+        metadata = self._load_metadata()
+        urls = {entry['url'] for entry in entries.values()}
+        updates = {key: None for key, entry in metadata.items() if key not in entries and entry['url'] in urls}
+        for key in updates:
+            del metadata[key]
+        metadata.update(entries)
+        updates.update(entries)
+        
+        if self._metadata_log is None:
+            self._metadata_log = open(self.metadata_log_file, 'ab')
+        self._metadata_log.write(orjson.dumps(updates) + b'\n')
+        self._metadata_log.flush()
+        self._metadata_dirty = True
+
+    def _flush_metadata(self):
+        """Compact logged metadata updates into metadata.json"""
+        if self._metadata_dirty:
+            self._save_metadata(self._metadata_cache)
 
     def _get_safe_filename(self, url, extension='.json'):
         """Generate a safe filename from URL"""
-        parsed = urlparse(url)
-        path = parsed.netloc + parsed.path
-        if not parsed.path or parsed.path == '/':
-            path += 'index'
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-        safe_filename = "".join(x if x.isalnum() or x in '-._' else '_' for x in path)
-        return f"{safe_filename}_{url_hash}{extension}"
+        stem = self._filename_cache.get(url)
+        if stem is None:
+            parsed = urlparse(url)
+            path = parsed.netloc + parsed.path
+            if not parsed.path or parsed.path == '/':
+                path += 'index'
+            if path.isascii():
+                path = path.translate(self._UNSAFE_FILENAME_TABLE)
+            else:
+                path = self._UNSAFE_FILENAME_RE.sub('_', path)
+            url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
+            stem = f"{path}_{url_hash}"
+            self._filename_cache[url] = stem
+        return stem + extension
+
+    def _iter_blocks(self, node):
+        """Walk the tree once, yielding (tag, text) for h1/h2 headings and content lines.
+        
+        Inline text is joined into one line until the next block element starts
+        or ends. Lines that open with a link are navigation artifacts and are
+        dropped. Block elements are entered through an explicit stack, so
+        deeply nested pages cannot exhaust the recursion limit.
+        """
+        inline = []
+        has_text = False
+        link_led = False
+        stack = [iter(node.children)]
+        
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                # End of a block element: flush the pending line
+                stack.pop()
+                if has_text and not link_led:
+                    yield 'text', ' '.join(''.join(inline).split())
+                inline = []
+                has_text = link_led = False
+                continue
+            
+            if isinstance(child, NavigableString):
+                # Skip comments, doctypes and other non-text strings
+                if type(child) is NavigableString:
+                    inline.append(child)
+                    has_text = has_text or not child.isspace()
+                continue
+            
+            name = child.name
+            if name in self._SKIP_TAGS:
+                continue
+            if name in ('div', 'a') and not self._NAV_CLASSES.isdisjoint(child.get('class') or ()):
+                continue
+            if name in self._INLINE_TAGS:
+                if name == 'a' and not has_text:
+                    link_led = True
+                text = child.get_text()
+                inline.append(text)
+                has_text = has_text or not text.isspace()
+                continue
+            
+            # Block boundary: flush the pending line
+            if has_text and not link_led:
+                yield 'text', ' '.join(''.join(inline).split())
+            inline = []
+            has_text = link_led = False
+            
+            if name in ('h1', 'h2'):
+                # Leave out permalink anchors, as for body text
+                title = ' '.join(
+                    text.strip() for text in child.find_all(string=True)
+                    if type(text) is NavigableString and not text.isspace()
+                    and not (text.parent.name == 'a' and not self._NAV_CLASSES.isdisjoint(text.parent.get('class') or ()))
+                )
+                if title:
+                    yield name, title
+            elif name == 'pre':
+                for match in self._PRE_LINE_RE.finditer(child.get_text()):
+                    yield 'text', match.group(1)
+            else:
+                stack.append(iter(child.children))
+
+    def _find_main_content(self, soup):
+        """Find the main content container in a single lazy pass over the tree.
+        
+        Prefers div.document, then main, article and div.content. The walk stops
+        at the first div.document, so Sphinx-style pages are not scanned in full.
+        """
+        best = None
+        best_rank = None
+        for tag in soup.descendants:
+            name = tag.name
+            if name == 'div':
+                classes = tag.get('class') or ()
+                rank = 0 if 'document' in classes else 3 if 'content' in classes else None
+            elif name == 'main':
+                rank = 1
+            elif name == 'article':
+                rank = 2
+            else:
+                continue
+            
+            if rank is not None and (best_rank is None or rank < best_rank):
+                best, best_rank = tag, rank
+                if rank == 0:
+                    break
+        return best
 
     def _extract_content(self, soup, url):
         """Extract and structure content from HTML"""
         # Get main content (customize selectors based on common documentation sites)
-        main_content = soup.find('div', class_='document') or soup.find('main') or soup.find('article') or soup.find('div', class_='content')
+        main_content = self._find_main_content(soup)
         if not main_content:
             main_content = soup
-
-        # Remove navigation elements
-        for nav in main_content.find_all(['nav', 'div'], class_=['headerlink', 'nav', 'navigation']):
-            nav.decompose()
-            
-        # Convert to markdown-like text
-        text_content = self.text_converter.handle(str(main_content))
         
-        # Split into sections
+        # Split into sections (navigation blocks are skipped by _iter_blocks): h1
+        # starts a section, h2 a subsection. The summary is collected in the same
+        # pass from the first three meaningful content lines
         sections = []
         current_section = {"title": "", "content": [], "subsections": []}
+        summary_text = []
         
-        # Clean up empty lines and navigation artifacts
-        lines = [line.strip() for line in text_content.split('\n') if line.strip() and not line.strip().startswith('[')]
-        
-        for line in lines:
-            if line.startswith('# '):
+        for tag, line in self._iter_blocks(main_content):
+            if tag == 'h1':
                 if current_section["content"] or current_section["subsections"]:
                     sections.append(current_section)
-                current_section = {"title": line[2:], "content": [], "subsections": []}
-            elif line.startswith('## '):
-                current_section["subsections"].append({"title": line[3:], "content": []})
+                current_section = {"title": line, "content": [], "subsections": []}
+            elif tag == 'h2':
+                current_section["subsections"].append({"title": line, "content": []})
             else:
                 if current_section["subsections"]:
                     current_section["subsections"][-1]["content"].append(line)
                 else:
                     current_section["content"].append(line)
+                if len(summary_text) < 3 and not line.startswith(('[', '|', '-')):
+                    summary_text.append(line)
         
         if current_section["content"] or current_section["subsections"]:
             sections.append(current_section)
         
-        # Create a summary from the first meaningful content
-        summary_text = []
-        for section in sections:
-            if section["content"]:
-                clean_content = [line for line in section["content"] if not line.startswith(('[', '|', '-'))]
-                if clean_content:
-                    summary_text.extend(clean_content[:3])
-            if len(summary_text) >= 3:
-                break
-                
-            # If we haven't found enough content, check subsections
-            if len(summary_text) < 3:
-                for subsection in section["subsections"]:
-                    clean_content = [line for line in subsection["content"] if not line.startswith(('[', '|', '-'))]
-                    if clean_content:
-                        summary_text.extend(clean_content[:3-len(summary_text)])
-                    if len(summary_text) >= 3:
-                        break
-        
         # Create structured content
         structured_content = {
             "url": url,
-            "title": soup.title.string if soup.title else "No title",
+            # A plain str: a NavigableString would keep the whole parse tree alive
+            "title": str(soup.title.string) if soup.title and soup.title.string else "No title",
             "sections": sections,
-            "summary": " ".join(summary_text[:3]) if summary_text else "No summary available",
+            "summary": " ".join(summary_text) if summary_text else "No summary available",
             "last_updated": datetime.now().isoformat()
         }
         
         return structured_content
 
-    def _generate_embeddings(self, content):
-        """Generate embeddings for content sections"""
-        embeddings = {}
+    def _generate_embeddings(self, contents):
+        """Generate embeddings for the sections of several pages.
         
-        # Generate embeddings for sections and their content
-        for section in content["sections"]:
-            # Combine section title and content
-            section_text = section["title"] + "\n" + "\n".join(section["content"])
-            embeddings[section["title"]] = self.model.encode(section_text)
-            
-            # Generate embeddings for subsections
-            for subsection in section["subsections"]:
-                subsection_text = subsection["title"] + "\n" + "\n".join(subsection["content"])
-                embeddings[subsection["title"]] = self.model.encode(subsection_text)
-        
-        return embeddings
-
-    def _save_embeddings(self, embeddings, filename):
-        """Save embeddings dictionary to a file"""
-        embeddings_data = {
-            'vectors': np.array(list(embeddings.values())),
-            'keys': list(embeddings.keys())
-        }
-        np.savez(filename, **embeddings_data)
+        Section texts whose content hash is not in the corpus's embedding_cache
+        table are encoded in a single call; results are split back per page,
+        returning one ``{section_title: vector}`` dict for each content.
+        """
+        keys = []
+        texts = []
+        offsets = [0]
+        
+        for content in contents:
+            for section in content["sections"]:
+                # Combine section title and content
+                keys.append(section["title"])
+                texts.append(section["title"] + "\n" + "\n".join(section["content"]))
+                
+                for subsection in section["subsections"]:
+                    keys.append(subsection["title"])
+                    texts.append(subsection["title"] + "\n" + "\n".join(subsection["content"]))
+            offsets.append(len(texts))
+        
+        if not texts:
+            return [{} for _ in contents]
+        
+        # Only encode texts whose content hash is not already cached. The encoder
+        # variant is part of the key so vectors from different variants never mix
+        variant = self._embedding_variant() + b'\0'
+        hashes = [hashlib.blake2b(variant + text.encode(), digest_size=16).digest() for text in texts]
+        cache = self._read_embedding_cache(set(hashes))
+        misses = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cache:
+                misses[text_hash] = text
+        
+        if misses:
+            # A single batched call lets the model sort by length and pad per batch;
+            # normalized vectors reduce cosine similarity to a dot product
+            new_vectors = self.model.encode(list(misses.values()), batch_size=self.EMBEDDING_BATCH_SIZE,
+                                            show_progress_bar=False, convert_to_numpy=True,
+                                            normalize_embeddings=True)
+            new_vectors = np.asarray(new_vectors, dtype=np.float16)
+            cache.update(zip(misses, new_vectors))
+            self._io_futures.append(self._io_pool.submit(
+                self._write_embedding_cache, [(text_hash, vector.tobytes()) for text_hash, vector in zip(misses, new_vectors)]
+            ))
+        
+        vectors = [cache[text_hash] for text_hash in hashes]
+        return [dict(zip(keys[start:end], vectors[start:end])) for start, end in zip(offsets, offsets[1:])]
+
+    def _embedding_variant(self):
+        """Tag naming the encoder that the model property loads, without loading it"""
+        if os.environ.get('USE_ONNX') == '1':
+            return b'all-MiniLM-L6-v2/onnx-int8'
+        import torch
+        return b'all-MiniLM-L6-v2/fp16-cuda' if torch.cuda.is_available() else b'all-MiniLM-L6-v2/int8-cpu'
+
+    def _read_embedding_cache(self, hashes):
+        """Look up cached float16 vectors for the given content hashes"""
+        hashes = list(hashes)
+        cache = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            for text_hash, vector in self._db.execute(
+                f"SELECT hash, vec FROM embedding_cache WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                cache[text_hash] = np.frombuffer(vector, dtype=np.float16)
+        return cache
+
+    def _write_embedding_cache(self, entries):
+        """Insert ``(hash, vector bytes)`` pairs into the embedding cache"""
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO embedding_cache (hash, vec) VALUES (?, ?)", entries)
+
+    def _write_pages(self, pages):
+        """Upsert pages and replace their section vectors in one transaction.
+        
+        Args:
+            pages (list): ``(url, content, embeddings)`` tuples
+        """
+        with self._db:
+            for url, content, embeddings in pages:
+                self._db.execute(
+                    "INSERT INTO pages (url, title, summary, content_json) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET title = excluded.title, summary = excluded.summary, "
+                    "content_json = excluded.content_json",
+                    (url, content['title'], content['summary'], orjson.dumps(content))
+                )
+                page_id = self._db.execute("SELECT id FROM pages WHERE url = ?", (url,)).fetchone()[0]
+                self._db.execute("DELETE FROM sections WHERE page_id = ?", (page_id,))
+                self._db.executemany(
+                    "INSERT INTO sections (page_id, title, vec) VALUES (?, ?, ?)",
+                    [(page_id, title, np.asarray(vector, dtype=np.float16).tobytes())
+                     for title, vector in embeddings.items()]
+                )
+
+    def _wait_for_writes(self):
+        """Block until queued background writes finish, re-raising any failure"""
+        futures, self._io_futures = self._io_futures, []
+        for future in futures:
+            future.result()
+
+    def _read_sections(self, after_id=0):
+        """Read stored section vectors with an id above ``after_id``.
+        
+        Returns:
+            tuple: (last section id read, [page id, section title] rows,
+            row-normalized float32 matrix)
+        """
+        last_id = after_id
+        vectors = []
+        rows = []
+        for section_id, page_id, section_title, vector in self._db.execute(
+                "SELECT id, page_id, title, vec FROM sections WHERE id > ? ORDER BY id", (after_id,)):
+            last_id = section_id
+            vectors.append(vector)
+            rows.append([page_id, section_title])
+        
+        if vectors:
+            matrix = np.frombuffer(b''.join(vectors), dtype=np.float16).reshape(len(vectors), -1).astype(np.float32)
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        matrix /= np.clip(np.linalg.norm(matrix, axis=1), 1e-12, None)[:, None]
+        return last_id, rows, matrix
+
+    def _write_search_index_layout(self, shape, rows, last_id):
+        """Write the JSON sidecar describing the packed embedding matrix"""
+        with open(self.index_rows_file, 'wb') as f:
+            f.write(orjson.dumps({'shape': list(shape), 'rows': rows, 'last_id': last_id}))
+
+    def _build_search_index(self):
+        """Pack every stored section embedding into one float16 matrix on disk.
+        
+        Rows are L2-normalized and written contiguously to ``index_vectors_file``;
+        ``index_rows_file`` records the matrix shape, the (page id, section
+        title) of each row and the last section id included.
+        """
+        last_id, rows, matrix = self._read_sections()
+        
+        matrix.astype(np.float16).tofile(self.index_vectors_file)
+        self._write_search_index_layout(matrix.shape, rows, last_id)
+        
+        if os.path.exists(self.faiss_index_file):
+            os.remove(self.faiss_index_file)
+        if faiss is not None and len(matrix):
+            # Inner products over normalized rows rank by cosine similarity. Small
+            # corpora use an exact flat scan; larger ones an approximate HNSW graph
+            if len(matrix) >= self.FAISS_HNSW_MIN_ROWS:
+                faiss_index = faiss.IndexHNSWFlat(matrix.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            else:
+                faiss_index = faiss.IndexFlatIP(matrix.shape[1])
+            faiss_index.add(matrix)
+            faiss.write_index(faiss_index, self.faiss_index_file)
+        
+        return self._load_search_index()
+
+    def _extend_search_index(self, index):
+        """Append sections stored since ``index`` was built, returning the updated index"""
+        last_id, rows, matrix = self._read_sections(index['last_id'])
+        if not rows:
+            return index
+        self._release_search_index(index)
+        
+        # Switch from the exact flat index to HNSW once the corpus outgrows it
+        if ('faiss' in index and not isinstance(index['faiss'], faiss.IndexHNSWFlat)
+                and len(index['rows']) + len(rows) >= self.FAISS_HNSW_MIN_ROWS):
+            return self._build_search_index()
+        
+        # Cut off rows written past the recorded shape by a run that died before
+        # updating the sidecar, so appended rows line up with their descriptions
+        with open(self.index_vectors_file, 'r+b') as f:
+            f.truncate(len(index['rows']) * matrix.shape[1] * np.dtype(np.float16).itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(matrix.astype(np.float16).tobytes())
+        all_rows = index['rows'] + rows
+        self._write_search_index_layout((len(all_rows), matrix.shape[1]), all_rows, last_id)
+        
+        if 'faiss' in index:
+            index['faiss'].add(matrix)
+            faiss.write_index(index['faiss'], self.faiss_index_file)
+        return self._load_search_index()
 
-    def _load_embeddings(self, filename):
-        """Load embeddings dictionary from a file"""
-        with np.load(filename) as data:
-            return dict(zip(data['keys'], data['vectors']))
+    def _load_search_index(self):
+        """Memory-map the packed embeddings and load their row descriptions.
+        
+        Returns None when the files on disk disagree with the sidecar, so the
+        caller rebuilds the index.
+        """
+        with open(self.index_rows_file, 'rb') as f:
+            layout = orjson.loads(f.read())
+        
+        shape = tuple(layout['shape'])
+        if os.path.getsize(self.index_vectors_file) < int(np.prod(shape)) * np.dtype(np.float16).itemsize:
+            return None
+        if shape[0]:
+            vectors = np.memmap(self.index_vectors_file, dtype=np.float16, mode='r', shape=shape)
+        else:
+            vectors = np.empty(shape, dtype=np.float16)
+        
+        index = {'vectors': vectors, 'rows': layout['rows'], 'last_id': layout.get('last_id')}
+        if faiss is not None and os.path.exists(self.faiss_index_file):
+            index['faiss'] = faiss.read_index(self.faiss_index_file)
+            if index['faiss'].ntotal != shape[0]:
+                return None
+        return index
 
-    def _is_valid_doc_link(self, url, base_url):
-        """Check if a URL is a valid documentation link to follow"""
+    def _release_search_index(self, index):
+        """Drop the index's vector mapping before its file is truncated or replaced.
+        
+        Windows refuses to resize or recreate a file while a mapping of it is
+        open, so callers release it before rewriting ``index_vectors_file``.
+        """
+        if index is not None:
+            index.pop('vectors', None)
+            index.pop('device_vectors', None)
+
+    def _get_search_index(self):
+        """Return the search index, bringing it up to date with the corpus.
+        
+        Sections are only ever appended with increasing ids, or deleted when a
+        page is re-scraped. New sections are appended to the existing index;
+        a full rebuild happens only when indexed sections have been deleted.
+        The check is skipped while the database is unchanged since the last call.
+        """
+        self._wait_for_writes()
+        # data_version moves when another connection commits; total_changes
+        # counts this connection's own writes
+        (data_version,) = self._db.execute("PRAGMA data_version").fetchone()
+        version = (data_version, self._db.total_changes)
+        if self._search_index is not None and version == self._search_index_version:
+            return self._search_index
+        
+        index = self._search_index
+        if index is None and os.path.exists(self.index_rows_file) and os.path.exists(self.index_vectors_file):
+            index = self._load_search_index()
+        
+        if index is None or index['last_id'] is None or not index['rows']:
+            self._release_search_index(index)
+            index = self._build_search_index()
+        else:
+            (indexed,) = self._db.execute(
+                "SELECT count(*) FROM sections WHERE id <= ?", (index['last_id'],)
+            ).fetchone()
+            if indexed != len(index['rows']):
+                self._release_search_index(index)
+                index = self._build_search_index()
+            else:
+                index = self._extend_search_index(index)
+        
+        self._search_index = index
+        self._search_index_version = version
+        return index
+
+    def _is_valid_doc_link(self, url, base_url, base_netloc=None):
+        """Check if a URL is a valid documentation link to follow.
+        
+        Pass ``base_netloc`` when validating many links from the same page to
+        avoid re-parsing ``base_url`` for each one.
+        """
         if not url:
             return False
 
         url = urljoin(base_url, url)
-        parsed_url = urlparse(url)
-        parsed_base = urlparse(base_url)
-        
         if url in self.visited_urls:
             return False
         
-        if parsed_url.netloc != parsed_base.netloc:
+        if base_netloc is None:
+            base_netloc = urlparse(base_url).netloc
+        if urlparse(url).netloc != base_netloc:
+            return False
+        
+        if any(part in url for part in self._SKIP_LINK_SUBSTRINGS):
             return False
         
-        skip_patterns = [
-            r'/static/',
-            r'/assets/',
-            r'/images/',
-            r'/css/',
-            r'/js/',
-            r'#',
-            r'\?',
-            r'mailto:',
-            r'tel:',
-        ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, url):
-                return False
-        
-        skip_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.css', '.js', '.ico']
-        if any(url.lower().endswith(ext) for ext in skip_extensions):
+        if url.lower().endswith(self._SKIP_LINK_EXTENSIONS):
             return False
         
         return True
 
-    def scrape_url(self, url, max_depth=2, current_depth=0):
-        """Scrape content from a URL and follow relevant links"""
-        if current_depth > max_depth or url in self.visited_urls:
-            return None
-            
-        try:
-            print(f"Scraping (depth {current_depth}): {url}")
-            self.visited_urls.add(url)
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract and structure content
-            content = self._extract_content(soup, url)
-            
-            # Generate embeddings
-            embeddings = self._generate_embeddings(content)
-            
-            # Save structured content
-            content_file = os.path.join(self.content_dir, self._get_safe_filename(url))
-            with open(content_file, 'w') as f:
-                json.dump(content, f, indent=2)
-            
-            # Save embeddings
-            embeddings_file = os.path.join(self.embeddings_dir, self._get_safe_filename(url, '.npz'))
-            self._save_embeddings(embeddings, embeddings_file)
-            
-            # Update metadata
-            metadata = self._load_metadata()
-            metadata[os.path.basename(content_file)] = {
+    def _host_slot(self, netloc):
+        """Return the semaphore bounding concurrent requests to one host"""
+        with self._host_slots_lock:
+            slot = self._host_slots.get(netloc)
+            if slot is None:
+                slot = self._host_slots[netloc] = threading.BoundedSemaphore(self.MAX_REQUESTS_PER_HOST)
+        return slot
+
+    def _fetch(self, url, parse_only=None):
+        """Download and parse a page; safe to run from worker threads.
+        
+        ``parse_only`` is an optional SoupStrainer limiting which tags are built.
+        """
+        # Stream the (transparently decompressed) body so oversized pages are capped
+        # instead of being buffered whole. iter_content wraps transport errors in
+        # requests exceptions, so a broken page fails on its own
+        with self._host_slot(urlparse(url).netloc):
+            with self.session.get(url, stream=True) as response:
+                response.raise_for_status()
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(self.RESPONSE_CHUNK_BYTES):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.MAX_RESPONSE_BYTES:
+                        break
+                body = b''.join(chunks)
+                # Only trust a charset the server actually declared; requests
+                # otherwise defaults text/* responses to ISO-8859-1
+                if 'charset' in response.headers.get('Content-Type', '').lower():
+                    encoding = response.encoding
+                else:
+                    encoding = None
+        
+        if len(body) > self.MAX_RESPONSE_BYTES:
+            print(f"Warning: {url} is larger than {self.MAX_RESPONSE_BYTES} bytes, truncating")
+            body = body[:self.MAX_RESPONSE_BYTES]
+        
+        # Hand the raw bytes to the parser; a declared charset is tried first so
+        # the document does not have to be sniffed for one
+        return BeautifulSoup(body, HTML_PARSER, parse_only=parse_only, from_encoding=encoding)
+
+    def _scrape_page(self, url, follow_links):
+        """Fetch and extract one page; safe to run from worker threads.
+        
+        Returns:
+            tuple: (structured content, hrefs of the page's links, or an
+            empty list when ``follow_links`` is false)
+        """
+        soup = self._fetch(url)
+        content = self._extract_content(soup, url)
+        hrefs = [link['href'] for link in soup.find_all('a', href=True)] if follow_links else []
+        return content, hrefs
+
+    def _store_pages(self, pages):
+        """Embed and store a batch of extracted pages.
+        
+        Args:
+            pages (list): ``(url, content, depth)`` tuples
+        
+        Returns:
+            dict: metadata key for each stored URL
+        """
+        # Let the previous batch's writes finish before queueing more
+        self._wait_for_writes()
+        
+        doc_ids = {}
+        entries = {}
+        all_embeddings = self._generate_embeddings([content for _, content, _ in pages])
+        
+        # Save structured content and embeddings in the background, one transaction per batch
+        self._io_futures.append(self._io_pool.submit(
+            self._write_pages,
+            [(url, content, embeddings) for (url, content, _), embeddings in zip(pages, all_embeddings)]
+        ))
+        
+        for url, content, depth in pages:
+            doc_id = self._get_safe_filename(url)
+            entries[doc_id] = {
                 'url': url,
                 'title': content['title'],
                 'date_scraped': datetime.now().isoformat(),
                 'content_type': 'github' if 'github.com' in url else 'documentation',
-                'depth': current_depth,
+                'depth': depth,
                 'summary': content['summary']
             }
-            self._save_metadata(metadata)
-            
+            doc_ids[url] = doc_id
             print(f"Successfully scraped and processed: {url}")
-            
-            # Find and follow relevant links
-            if current_depth < max_depth:
-                links_to_follow = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if self._is_valid_doc_link(href, url):
-                        full_url = urljoin(url, href)
-                        links_to_follow.append(full_url)
-                
-                for link_url in links_to_follow:
-                    self.scrape_url(link_url, max_depth, current_depth + 1)
-            
-            return content_file
-            
-        except requests.RequestException as e:
-            print(f"Error scraping {url}: {str(e)}")
+        
+        self._update_metadata(entries)
+        return doc_ids
+
+    def scrape_url(self, url, max_depth=2, current_depth=0):
+        """Scrape content from a URL and follow relevant links"""
+        if current_depth > max_depth or url in self.visited_urls:
             return None
+        return self._crawl([(url, current_depth, max_depth)]).get(url)
+
+    def _crawl(self, seeds):
+        """Crawl from several seed URLs in one breadth-first pass.
+        
+        Pages are fetched and extracted concurrently by a thread pool, so parse
+        trees never leave the workers; embedding and storage happen on the
+        calling thread, which is also the only one touching ``visited_urls``.
+        Extracted pages are embedded and stored in batches of
+        ``EMBEDDING_PAGE_BATCH``.
+        
+        Args:
+            seeds (list): ``(url, depth, max_depth)`` tuples; links found on a
+                page are followed while its depth is below its seed's max_depth
+        
+        Returns:
+            dict: metadata key for each stored URL
+        """
+        queue = deque()
+        for url, depth, max_depth in seeds:
+            self.visited_urls.add(url)
+            queue.append((url, depth, max_depth))
+        pending = {}
+        batch = []
+        doc_ids = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queue or pending:
+                # Keep the pool saturated without queueing every discovered link at once
+                while queue and len(pending) < self.max_workers:
+                    page_url, depth, max_depth = queue.popleft()
+                    print(f"Scraping (depth {depth}): {page_url}")
+                    future = executor.submit(self._scrape_page, page_url, depth < max_depth)
+                    pending[future] = (page_url, depth, max_depth)
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url, depth, max_depth = pending.pop(future)
+                    try:
+                        content, hrefs = future.result()
+                    except Exception as e:
+                        # A page that fails to download or extract only skips itself
+                        print(f"Error scraping {page_url}: {str(e)}")
+                        continue
+                    
+                    batch.append((page_url, content, depth))
+                    if len(batch) >= self.EMBEDDING_PAGE_BATCH:
+                        doc_ids.update(self._store_pages(batch))
+                        batch = []
+                    
+                    # Queue relevant links
+                    if hrefs:
+                        page_netloc = urlparse(page_url).netloc
+                        for href in hrefs:
+                            if self._is_valid_doc_link(href, page_url, page_netloc):
+                                full_url = urljoin(page_url, href)
+                                self.visited_urls.add(full_url)
+                                queue.append((full_url, depth + 1, max_depth))
+        
+        if batch:
+            doc_ids.update(self._store_pages(batch))
+        self._wait_for_writes()
+        self._flush_metadata()
+        return doc_ids
 
     def clone_github_repo(self, repo_url):
         """Clone a GitHub repository and process its contents.
@@ -294,49 +948,45 @@ class DocumentationScraper:
             print(f"Cloning repository {repo_name}...")
             subprocess.run(['git', 'clone', repo_url, repo_path], check=True)
         
-        # Process repository contents
-        repo_files = []
+        # Gather the repository's files, then read and serialize them across processes
+        tasks = []
         for root, _, files in os.walk(repo_path):
             if '.git' in root:  # Skip .git directory
                 continue
             for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Generate a unique ID for this file
-                    relative_path = os.path.relpath(file_path, repo_path)
-                    file_id = self._get_safe_filename(f"{repo_url}/{relative_path}")
-                    
-                    # Store the content
-                    content_path = os.path.join(self.content_dir, file_id)
-                    with open(content_path, 'w', encoding='utf-8') as f:
-                        json.dump({
-                            'url': f"{repo_url}/blob/main/{relative_path}",
-                            'path': relative_path,
-                            'content': content,
-                            'type': 'github_file'
-                        }, f, indent=2)
-                    
-                    # Update metadata
-                    metadata = self._load_metadata()
-                    metadata[file_id] = {
-                        'url': f"{repo_url}/blob/main/{relative_path}",
-                        'title': relative_path,
-                        'type': 'github_file',
-                        'timestamp': datetime.now().isoformat(),
-                        'repo_url': repo_url
-                    }
-                    self._save_metadata(metadata)
-                    
-                    repo_files.append(file_id)
-                except UnicodeDecodeError:
-                    # Skip binary files
+                relative_path = os.path.relpath(os.path.join(root, file), repo_path)
+                file_id = self._get_safe_filename(f"{repo_url}/{relative_path}")
+                tasks.append((repo_url, repo_path, relative_path, file_id))
+        
+        # Store the content from this process; metadata is recorded once the walk finishes
+        repo_files = []
+        entries = {}
+        # Workers start from a fresh interpreter rather than forking this process,
+        # which may already run I/O and model threads; the forkserver preloads
+        # only the light worker module
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('forkserver')
+            mp_context.set_forkserver_preload([process_repo_file.__module__])
+        else:
+            mp_context = multiprocessing.get_context('spawn')
+        
+        with ProcessPoolExecutor(mp_context=mp_context) as executor:
+            for result in executor.map(process_repo_file, tasks, chunksize=32):
+                if result is None:
                     continue
+                file_id, entry, content_json = result
+                content_path = os.path.join(self.content_dir, file_id)
+                try:
+                    with open(content_path, 'wb') as f:
+                        f.write(content_json)
                 except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+                    print(f"Error processing {content_path}: {e}")
+                    continue
+                entries[file_id] = entry
+                repo_files.append(file_id)
         
+        self._update_metadata(entries)
+        self._flush_metadata()
         return repo_files
 
     def detect_url_type(self, url):
@@ -370,8 +1020,7 @@ class DocumentationScraper:
             
             if 'text/html' in content_type:
                 # Make a GET request to check content
-                response = self.session.get(url)
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = self._fetch(url, parse_only=HEAD_STRAINER)
                 
                 # Common documentation indicators
                 doc_indicators = [
@@ -423,54 +1072,73 @@ class DocumentationScraper:
 
         self.visited_urls.clear()
         
+        # Crawl every document in a single pass so the fetch pool stays busy across them
+        original_depths = {}
+        for data in metadata.values():
+            original_depths.setdefault(data['url'], data.get('depth', 2))
+        
         print(f"Refreshing {len(urls_to_refresh)} documents...")
-        for url in urls_to_refresh:
-            print(f"\nRefreshing: {url}")
-            original_depth = 0
-            for data in metadata.values():
-                if data['url'] == url:
-                    original_depth = data.get('depth', 2)
-                    break
-            self.scrape_url(url, max_depth=original_depth)
+        self._crawl([(url, 0, original_depths.get(url, 0)) for url in urls_to_refresh])
 
     def semantic_search(self, query, top_k=5):
         """Search through documentation using semantic similarity"""
         print(f"Searching for: {query}")
-        query_embedding = self.model.encode(query)
+        index = self._get_search_index()
+        top_k = min(top_k, len(index['rows']))
+        if top_k <= 0:
+            return []
         
-        results = []
-        metadata = self._load_metadata()
+        query_embedding = np.asarray(self.model.encode(query, normalize_embeddings=True), dtype=np.float32)
         
-        for filename in os.listdir(self.embeddings_dir):
-            if not filename.endswith('.npz'):
-                continue
-                
-            embeddings = self._load_embeddings(os.path.join(self.embeddings_dir, filename))
-            content_file = os.path.join(self.content_dir, filename.replace('.npz', '.json'))
-            
-            if not os.path.exists(content_file):
-                continue
-                
-            with open(content_file, 'r') as f:
-                content = json.load(f)
+        if 'faiss' in index:
+            similarities, rows = index['faiss'].search(query_embedding[None, :], top_k)
+            hits = [(row, score) for row, score in zip(rows[0], similarities[0]) if row >= 0]
+        else:
+            # Rows and query are L2-normalized, so one matrix-vector product gives all cosine similarities.
+            # torch is only loaded with the sentence-transformers model, never just for scoring
+            torch = sys.modules.get('torch')
+            if torch is not None and torch.cuda.is_available():
+                # Keep the float16 matrix on the GPU across queries and score there
+                if 'device_vectors' not in index:
+                    index['device_vectors'] = torch.from_numpy(np.array(index['vectors'])).to('cuda')
+                device_query = torch.from_numpy(query_embedding).to('cuda', dtype=torch.float16)
+                scores = torch.mv(index['device_vectors'], device_query).float().cpu().numpy()
+            else:
+                # Upcast the float16 rows block by block rather than copying the whole matrix
+                vectors = index['vectors']
+                scores = np.empty(len(vectors), dtype=np.float32)
+                for start in range(0, len(vectors), self.SCORE_BLOCK_ROWS):
+                    block = np.asarray(vectors[start:start + self.SCORE_BLOCK_ROWS], dtype=np.float32)
+                    scores[start:start + len(block)] = _cosine_scores(block, query_embedding)
             
-            # Calculate similarities for each section
-            for section_title, section_embedding in embeddings.items():
-                similarity = np.dot(query_embedding, section_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(section_embedding)
-                )
-                
-                results.append({
-                    'url': content['url'],
-                    'title': content['title'],
-                    'section': section_title,
-                    'similarity': similarity,
-                    'summary': content['summary']
-                })
-        
-        # Sort by similarity and return top results
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:top_k]
+            # Select the top results without sorting every section
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            hits = [(row, scores[row]) for row in top]
+        
+        # Hydrate only the pages that made it into the top results
+        page_ids = sorted({index['rows'][row][0] for row, _ in hits})
+        pages = {
+            page_id: (url, title, summary)
+            for page_id, url, title, summary in self._db.execute(
+                f"SELECT id, url, title, summary FROM pages WHERE id IN ({','.join('?' * len(page_ids))})",
+                page_ids
+            )
+        }
+        
+        results = []
+        for row, score in hits:
+            page_id, section_title = index['rows'][row]
+            url, title, summary = pages[page_id]
+            results.append({
+                'url': url,
+                'title': title,
+                'section': section_title,
+                'similarity': float(score),
+                'summary': summary
+            })
+        
+        return results
 
     def list_scraped_pages(self):
         """List all scraped pages with their metadata"""
@@ -491,6 +1159,7 @@ def main():
     parser.add_argument('urls', nargs='*', help='URLs to scrape (automatically detects GitHub repos and documentation sites)')
     parser.add_argument('-d', '--directory', default='doc-resource', help='Directory to store scraped content (default: doc-resource)')
     parser.add_argument('--depth', type=int, default=2, help='Maximum depth to follow links (default: 2)')
+    parser.add_argument('--workers', type=int, default=16, help='Number of pages to fetch concurrently (default: 16)')
     parser.add_argument('--refresh', action='store_true', help='Refresh existing documentation')
     parser.add_argument('--refresh-urls', nargs='*', help='Refresh specific URLs')
     parser.add_argument('--search', help='Search documentation')
@@ -498,7 +1167,7 @@ def main():
     parser.add_argument('-l', '--list', action='store_true', help='List all scraped pages')
     
     args = parser.parse_args()
-    scraper = DocumentationScraper(args.directory)
+    scraper = DocumentationScraper(args.directory, max_workers=args.workers)
     
     if args.search:
         results = scraper.semantic_search(args.search, limit=args.limit)